@@ -1,6 +1,6 @@
 import numpy as np
-from math import sqrt, log10, floor
-import scipy.signal as signal
+from math import floor
+from astropy.timeseries import LombScargle
 
 
 class Lightcurve(object):
@@ -10,6 +10,28 @@ class Lightcurve(object):
         self.tE = params['tau']  # characteristic timescale
         self.t0 = params['Tmax']  # time of max intensity
         self.fbl = self.__validate_fbl(params['fbl'])  # blending fraction
+        self._model_cache = None  # (key, model) from last centered_vals call
+
+    # umin and tE are properties so the invariants used by mag stay in
+    # sync if they are changed after construction; params.dat may leave
+    # them unset ("-" parses to None), in which case mag cannot be used
+    @property
+    def umin(self):
+        return self._umin
+
+    @umin.setter
+    def umin(self, umin):
+        self._umin = umin
+        self._umin2 = umin**2 if umin is not None else None
+
+    @property
+    def tE(self):
+        return self._tE
+
+    @tE.setter
+    def tE(self, tE):
+        self._tE = tE
+        self._inv_tE = 1.0 / tE if tE else None
 
     def __validate_fbl(self, fbl):
         if fbl > 1:
@@ -19,25 +41,35 @@ class Lightcurve(object):
         return fbl
 
     def mag(self, t):
-        '''Compute magnitude of lens with respect to time.'''
-        u = sqrt(
-            self.umin**2 + ( (t-self.t0) / self.tE )**2
-        )
-        flux_ratio = ((u**2 + 2)/(u * sqrt(u**2 + 4)))
+        '''Compute magnitude of lens with respect to time. Accepts a
+        single time value or an array of time values.'''
+        t = np.asarray(t, dtype=float)
+        dt = (t - self.t0) * self._inv_tE
+        u2 = self._umin2 + dt*dt
+        u = np.sqrt(u2)
+        flux_ratio = (u2 + 2)/(u * np.sqrt(u2 + 4))
         # consider blending fraction
         flux_ratio = (flux_ratio-1) * self.fbl + 1
-        mag = -2.5 * log10(flux_ratio) + self.Ibl
+        mag = -2.5 * np.log10(flux_ratio) + self.Ibl
         return mag  # I
 
     def centered_vals(self, time_array):
         '''Generate lightcurve centered around the time of max
-        intensity t_0. Return list with value format (t, I).'''
-        first_t = floor(min(time_array))
-        last_t = floor(max(time_array))
+        intensity t_0. Return list with value format (t, I). The model from
+        the last call is reused if neither the time range nor the
+        lightcurve parameters have changed.'''
+        first_t = floor(np.min(time_array))
+        last_t = floor(np.max(time_array))
+        key = (self.Ibl, self.umin, self.tE, self.t0, self.fbl, first_t, last_t)
+        if self._model_cache is not None and self._model_cache[0] == key:
+            return dict(self._model_cache[1])
         tmodel = np.arange(first_t, last_t+1, 1/24)
-        Imodel = np.array([self.mag(t) for t in tmodel])
+        Imodel = self.mag(tmodel)
+        for a in (tmodel, Imodel):
+            a.setflags(write=False)
         model = {'t':tmodel, 'I':Imodel}
-        return model
+        self._model_cache = (key, model)
+        return dict(model)
 
 def ra(timestring):
     hr, mins, sec = [float(s) for s in timestring.split(':')]
@@ -50,45 +82,46 @@ def dec(timestring):
     return round(ans, 3) 
 
 def pgram(tdata, Idata):
-    crop = False  # cropping for Fourier transform
-    if crop:
-        ind = np.where(tdata > 2453000)
-        tdata = tdata[ind]
-        Idata = Idata[ind]
-
-    # more steps
+    # subtract epoch in float64; no downcast since astropy upcasts anyway
     tdata = tdata-2450000
+    # regular grid for the fast method; astropy already pads its FFT to a
+    # power of two, so a longer grid here would only cost more time
     freq = np.linspace(0.0001, 0.03, 10000)  # angular
-    pgram = signal.lombscargle(tdata, Idata, freq, normalize=True)  # ???
-
-    pgramtemp = pgram[np.where(freq > 0.01)]
-
-    maxpgram = np.max(pgramtemp)  # ???
-    freq_at_maxgram = freq[np.where(np.max(pgram) == pgram)][0]  # angular frequency at maxpgram
+    # astropy expects cyclic frequency; data is left uncentered so the
+    # normalized power matches scipy.signal.lombscargle(normalize=True)
+    ls = LombScargle(tdata, Idata, fit_mean=False, center_data=False)
+    pgram = ls.power(
+        freq / (2*np.pi), method='fast', assume_regular_frequency=True
+    )
+
+    # freq is sorted, so windows on it are found by binary search
+    i0 = np.searchsorted(freq, 0.01, side='right')  # first freq > 0.01
+    imax = i0 + np.argmax(pgram[i0:])
+    maxpgram = pgram[imax]  # ???
+    freq_at_maxgram = freq[np.argmax(pgram)]  # angular frequency at maxpgram
     parallax_period = 2 * np.pi / freq_at_maxgram
-    maxpgram365 = np.mean(pgram[np.where(np.abs(freq - 0.017) < 0.00001)])
+    # 365 day alias: freq within 0.00001 of 0.017
+    lo = np.searchsorted(freq, 0.017 - 0.00001, side='right')
+    hi = np.searchsorted(freq, 0.017 + 0.00001, side='left')
+    maxpgram365 = np.mean(pgram[lo:hi])
     maxpgram365_norm = maxpgram365 / maxpgram
 
     def getfwhm():
         # Full width half max:
-        i=np.where(pgram==maxpgram)[0][0]
-        j=i
-        lowflag = highflag = 0
-        lower = higher = 0
-        while j > 0 and i < len(pgram)-1:
-            if pgram[j] >= maxpgram/2 and pgram[j-1] < maxpgram/2 and lowflag==0 :
-                lower=freq[j-1]
-                lowflag=1
-            if pgram[i] >= maxpgram/2 and pgram[i+1] < maxpgram/2 and highflag==0 :
-                higher=freq[i+1]
-                highflag=1
-            if lowflag==1 and highflag==1 :
-                break
-            i=i+1
-            j=j-1
-        if highflag==0 or lowflag==0:
+        i = imax
+        # crossings are only searched within the same number of steps
+        # on either side of the peak, bounded by the nearer end of pgram
+        reach = min(i, len(pgram)-1 - i)
+        edges = np.diff((pgram >= maxpgram/2).astype(np.int8))
+        falling = np.flatnonzero(edges == -1)  # pgram[k] >= half > pgram[k+1]
+        rising = np.flatnonzero(edges == 1)  # pgram[k] < half <= pgram[k+1]
+        falling = falling[(falling >= i) & (falling - i < reach)]
+        rising = rising[(rising < i) & (i - rising <= reach)]
+        if len(falling) == 0 or len(rising) == 0:
             fwhm = 0.0
         else:
+            higher = freq[falling[0] + 1]
+            lower = freq[rising[-1]]
             fwhm = higher - lower
         return fwhm
     fwhm = getfwhm()
@@ -104,26 +137,15 @@ def pgram(tdata, Idata):
         'pgram': pgram,
     }
 
-def reduced_chi_square(datapoints, func, Nu):
-    '''Calculate reduced chi-square using provided datapoints
-    ( as list with value format: (t,I,Ierr) ), function for obtaining
-    calculated values, the number of fitted parameters (degrees of freedom) Nu.'''
+def reduced_chi_square(x, y, yerr, func, Nu):
+    '''Calculate reduced chi-square using provided data arrays x, y, yerr
+    ( e.g. t, I, Ierr ), vectorized function for obtaining calculated values,
+    the number of fitted parameters (degrees of freedom) Nu.'''
     # calculated using formula from wikipedia:
     # https://en.wikipedia.org/wiki/Reduced_chi-squared_statistic
-    thesum = 0
-    for i in range(len(datapoints)):
-        dp = datapoints[i]  # (x, y, yerr) ==> (t, I, Ierr)
-
-        Oi = dp[1]  # I (data)
-        sigma_i = dp[2]  # Ierr (data)
-
-        x = dp[0]  # t (data)
-        Ci = func(x)  # I (model)
-
-        square_diff = (Oi - Ci)**2
-        variance = sigma_i**2
-
-        addend = square_diff / variance
-        thesum += addend
-    rcs = thesum / ( len(datapoints) - Nu )
+    O = np.asarray(y)  # I (data)
+    C = func(x)  # I (model)
+    variance = np.asarray(yerr)**2
+    thesum = np.sum((O - C)**2 / variance)
+    rcs = thesum / ( len(O) - Nu )
     return round(rcs, 3)
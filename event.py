@@ -1,11 +1,16 @@
 from oglelib.filegrabber import padded_n, FileGrabber
 from oglelib.parse import PhotParser, ParamsParser
 from oglelib.calculations import Lightcurve, reduced_chi_square, ra, dec, pgram
-from matplotlib.pyplot import rcParams, figure
-from numpy import where, sqrt
+from numpy import hypot
 from os import environ
+from functools import cached_property
 
-rcParams.update({'figure.max_open_warning': 0})  # suppress too many open figures warning
+def figure(**kwargs):
+    '''Return new matplotlib figure. pyplot is imported here rather than
+    at module level so that non-plotting use of Event stays fast.'''
+    import matplotlib.pyplot as plt
+    plt.rcParams.update({'figure.max_open_warning': 0})  # suppress too many open figures warning
+    return plt.figure(**kwargs)
 
 class Event(object):
     def __init__(self, year, n, field='blg', fgrabber=None, sigmamin=0.0):
@@ -33,7 +38,7 @@ class Event(object):
 
         self.params = self.__params()
 
-        if field is 'blg':
+        if field == 'blg':
             self.lightcurve = Lightcurve(self.params)
 
         self.sigmamin = sigmamin  # sigma_min for Ierr correction
@@ -48,29 +53,32 @@ class Event(object):
         })
         return params
 
+    @cached_property
+    def _photdata(self):
+        '''Parse phot.dat file once and keep the (read-only) t, I, Ierr arrays.'''
+        phot_parser = PhotParser(self.phot_datfile.contents)
+        arrays = tuple(phot_parser.getdata().values())
+        for a in arrays:
+            a.setflags(write=False)
+        return arrays
+
     def data(self, cleanse=True):
         '''Return data as dict with keys t, I, and Ierr.'''
-        phot_parser = PhotParser(self.phot_datfile.contents)
-        t, I, Ierr = phot_parser.getdata().values()
+        t, I, Ierr = self._photdata
 
         if cleanse:
             ## remove placeholder values
-            ind = where(I < 25)
-            t = t[ind]
-            I = I[ind]
-            Ierr = Ierr[ind]
+            mask = I < 25
+            t = t[mask]
+            I = I[mask]
             ## implement Ierr quadrature correction
-            Ierr = sqrt(Ierr**2 + self.sigmamin**2)  # Ierr_tot
+            Ierr = hypot(Ierr[mask], self.sigmamin)  # Ierr_tot
+        else:
+            ## copy so callers get writable arrays, not the read-only cache
+            t, I, Ierr = t.copy(), I.copy(), Ierr.copy()
 
         return t, I, Ierr
 
-    def datapoints(self):
-        '''Return data as one dimensional list of tuples containing
-        (t, I, Ierr).'''
-        t, I, Ierr = self.data()
-        dp = [( t[i], I[i], Ierr[i] ) for i in range(len(t))]
-        return dp
-
     def rcs(self, degfreedom=5):
         '''Calculate reduced chi square value of event data. The self.sigmamin is
         the sigma_min value used in the sigma_i_tot correction. The degfreedom
@@ -78,8 +86,8 @@ class Event(object):
         lc = self.lightcurve
         mag_func = lc.mag  # function for computing magnitude
 
-        datapoints = self.datapoints()  # t, I, Ierr
-        rcs = reduced_chi_square(datapoints, mag_func, Nu=degfreedom)
+        t, I, Ierr = self.data()
+        rcs = reduced_chi_square(t, I, Ierr, mag_func, Nu=degfreedom)
         return rcs
 
     def plot(self, halfwidth_scale=2, toffset=2450000, xlims='auto', **kwargs):
@@ -100,8 +108,8 @@ class Event(object):
         Imodel = model['I']
 
         # subtract toffset from t values for easier comprehension
-        tdata = [t-toffset for t in tdata]
-        tmodel = [t-toffset for t in tmodel]
+        tdata = tdata - toffset
+        tmodel = tmodel - toffset
 
         # plot data
         axes.errorbar(tdata, Idata, yerr=Ierrdata, fmt='.')
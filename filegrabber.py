@@ -1,6 +1,9 @@
 from string import Template
 from ftplib import FTP, error_perm, error_temp
-from io import StringIO
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from queue import Queue
 import os, sys
 
 ftp_url = 'ftp.astrouw.edu.pl'
@@ -14,6 +17,7 @@ local_filepath_temp = Template(
     '${datadir}/${year}/${field}-${padded_n}/${dat_type}.dat'
 )
 
+@lru_cache(maxsize=None)
 def get_ogle_version(year):
     '''Determine ogle version (2,3,4) from given year.'''
     if 1998 <= year <= 2000:
@@ -26,6 +30,7 @@ def get_ogle_version(year):
         raise Exception('Unsupported year.')
     return(version)
 
+@lru_cache(maxsize=None)
 def padded_n(n, year):
     '''Pad the event number, n, with appropriate number of leading zeros.'''
     version = get_ogle_version(year)
@@ -39,22 +44,6 @@ def padded_n(n, year):
     return(n)
 
 
-class DatStream(StringIO):
-    '''Modified StringIO object whose write method appends
-    a newline to the stream.'''
-    def __init__(self):
-        super().__init__()
-    def write(self, s):
-        '''Additional newline appended makes this method suitable for
-        usage as a callback function for ftplib.FTP.retrlines method
-        since newlines are automatically stripped from the output to be
-        appended to the stream/file.'''
-        super().write(s + '\n')
-    def getvalue(self):
-        v = super().getvalue().strip()
-        return(v)
-
-
 class RemoteDatFile(object):
     '''Represent datfile that is not present on local filesystem.'''
     def __init__(self, year, n, field, dat_type):
@@ -84,30 +73,40 @@ class RemoteDatFile(object):
         fileurl = 'ftp://' + ftp_url + self.filepath
         return(fileurl)
 
-    def get_contents(self, ftp):
+    def get_contents(self, ftp, retries=3):
         '''Retrieve contents of dat file with given
-        dat_type (phot, params). Takes ftplib.FTP object as argument.'''
+        dat_type (phot, params). Takes ftplib.FTP object as argument.
+        Reconnects and retries up to [retries] times if the connection
+        has timed out or broken.'''
         cmd = 'RETR {}'.format(self.filepath)
 
-        with DatStream() as stream:
-            try:
-                ftp.retrlines(cmd, stream.write)
-                filecontents = stream.getvalue()
-            except error_perm as e:
-                err_msg = str(e)
-                err_code = int(err_msg.split()[0])
-                if err_code == 550:
-                    msg = 'url: {} is invalid'.format(self.filepath)
-                elif err_code == 530:
-                    msg = 'ftp is not enabled'
-                raise Exception(msg)
-            except (error_temp, BrokenPipeError) as e:  # connection was idle for too long resulting in timeout or broken pipe error
-                # reload ftp client
-                ftp.close()
-                ftp.connect(ftp_url)
-                ftp.login()
-                # try again
-                self.get_contents(ftp)
+        with BytesIO() as stream:
+            for attempt in range(retries + 1):
+                # discard anything written by a failed attempt
+                stream.seek(0)
+                stream.truncate()
+                try:
+                    # binary transfer hands over whole blocks rather than
+                    # invoking a callback per line like retrlines
+                    ftp.retrbinary(cmd, stream.write)
+                    filecontents = stream.getvalue().decode(ftp.encoding)
+                    filecontents = filecontents.replace('\r\n', '\n').strip()
+                    break
+                except error_perm as e:
+                    err_msg = str(e)
+                    err_code = int(err_msg.split()[0])
+                    if err_code == 550:
+                        msg = 'url: {} is invalid'.format(self.filepath)
+                    elif err_code == 530:
+                        msg = 'ftp is not enabled'
+                    raise Exception(msg)
+                except (error_temp, BrokenPipeError) as e:  # connection was idle for too long resulting in timeout or broken pipe error
+                    if attempt == retries:
+                        raise
+                    # reload ftp client and try again
+                    ftp.close()
+                    ftp.connect(ftp_url)
+                    ftp.login()
         return(filecontents)
 
 
@@ -158,6 +157,10 @@ class FileGrabber(object):
         '''Return filegrabber.Datfile object with specified year, n, field,
         and dat_type. Search specified datadir before attempting to retrieve
         datfile contents from ogle ftp server.'''
+        return(self.__get_datfile(year, n, field, dat_type, self.ftpclient))
+
+    def __get_datfile(self, year, n, field, dat_type, ftpclient):
+        '''Same as get_datfile, but downloads using the given ftp client.'''
         rdf = RemoteDatFile(year, n, field, dat_type)
         contents = None
         if self.datadir:  # data directory provided
@@ -165,8 +168,8 @@ class FileGrabber(object):
             if os.path.isfile(local_filepath):  # file already downloaded, use this file
                 with open(local_filepath, 'r') as f:
                     contents = f.read()
-            elif self.ftpclient:  # file not yet downloaded, download file
-                contents = rdf.get_contents(self.ftpclient)
+            elif ftpclient:  # file not yet downloaded, download file
+                contents = rdf.get_contents(ftpclient)
         if contents:
             datfile = DatFile(rdf.fileurl, contents)
             return(datfile)
@@ -188,19 +191,84 @@ class FileGrabber(object):
                 f.write(s)
             return(1)  # file was successfully written
 
+    def __save(self, year, n, field, ftpclient):
+        '''Save phot.dat and params.dat file for specified year, n, field,
+        downloading any missing files using the given ftp client. Return
+        list of (filepath, outcome) pairs, see __force_write.'''
+        results = []
+        dat_types = ('phot', 'params')
+        for dt in dat_types:
+            datfile = self.__get_datfile(year, n, field, dt, ftpclient)
+            filepath = self.__get_local_filepath(year, n, field, dt)
+            outcome = self.__force_write(filepath, datfile.contents)
+            results.append((filepath, outcome))
+        return(results)
+
+    def __report(self, results):
+        '''Print whether each file in results was saved or already existed.'''
+        for filepath, outcome in results:
+            if outcome == 0:
+                print('{0} {1}'.format(filepath, 'exists'))
+            elif outcome == 1:
+                print('{0} {1}'.format(filepath, 'saved'))
+
     def save(self, year, n, field='blg'):
         '''Download and save phot.dat and params.dat file for specfied
         year, n, field in datadir with which the class was instantiated.'''
         if self.datadir is not None:
-            dat_types = ('phot', 'params')
-            for dt in dat_types:
-                datfile = self.get_datfile(year, n, field, dt)
-                filepath = self.__get_local_filepath(year, n, field, dt)
-                outcome = self.__force_write(filepath, datfile.contents)
-                if outcome == 0:
-                    print('{0} {1}'.format(filepath, 'exists'))
-                elif outcome == 1:
-                    print('{0} {1}'.format(filepath, 'saved'))
+            results = self.__save(year, n, field, self.ftpclient)
+            self.__report(results)
         else:
             msg = 'No data directory provided.'
             raise Exception(msg)
+
+    def save_many(self, events, n_workers=4):
+        '''Download and save phot.dat and params.dat files for each event in
+        events, given as (year, n) or (year, n, field) tuples. Downloads run
+        concurrently in n_workers threads, each with its own ftp connection.'''
+        if self.datadir is None:
+            msg = 'No data directory provided.'
+            raise Exception(msg)
+        events = list(events)
+        n_workers = min(n_workers, len(events))
+        if n_workers == 0:
+            return
+
+        def save_event(year, n, field='blg'):
+            ftpclient = ftpclients.get()
+            try:
+                return(self.__save(year, n, field, ftpclient))
+            finally:
+                ftpclients.put(ftpclient)
+
+        # one ftp connection per worker, handed out to tasks as they run
+        ftpclients = Queue()
+        try:
+            for i in range(n_workers):
+                ftpclient = FTP(ftp_url) if self.ftpclient else None
+                ftpclients.put(ftpclient)  # queued before login so it is closed on failure
+                if ftpclient:
+                    ftpclient.login()
+
+            error = None
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(save_event, *e) for e in events]
+                # report from this thread only, so output lines don't interleave
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    if future.exception() is None:
+                        self.__report(future.result())
+                    elif error is None:
+                        # stop queued events; ones already running still
+                        # finish and are reported before raising
+                        error = future.exception()
+                        for f in futures:
+                            f.cancel()
+            if error is not None:
+                raise error
+        finally:
+            while not ftpclients.empty():
+                ftpclient = ftpclients.get()
+                if ftpclient:
+                    ftpclient.close()
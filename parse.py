@@ -1,6 +1,12 @@
-from io import StringIO
+import re
 import numpy as np
 
+# "name  value..." rows of a params.dat file; rows without a value
+# (e.g. empty Remarks) do not match
+_PARAM_ROW = re.compile(r'^[ \t]*(\S+)[ \t]+(\S.*?)[ \t\r]*$', re.M)
+# names of the rows in the top section; the rest are (value, error) rows
+_TOP_NAMES = ('Field', 'Star', 'RA(J2000.0)', 'Dec(J2000.0)', 'Remarks')
+
 class PhotParser(object):
     '''For parsing phot.dat files. Takes contents of file as arg.'''
     def __init__(self, filecontents):
@@ -8,8 +14,12 @@ class PhotParser(object):
 
     def getdata(self):
         data = {}
-        fileobj = StringIO(self.contents)
-        data['t'], data['I'], data['Ierr'] = np.loadtxt(fileobj, usecols=(0,1,2), unpack=True)
+        # np.loadtxt parses with a C tokenizer (numpy >= 1.23), and takes
+        # the lines directly so no StringIO wrapper is needed
+        lines = self.contents.splitlines()
+        data['t'], data['I'], data['Ierr'] = np.loadtxt(
+            lines, usecols=(0,1,2), dtype=np.float64, unpack=True
+        )
         return data
 
 class ParamsParser(object):
@@ -17,53 +27,33 @@ class ParamsParser(object):
     def __init__(self, filecontents):
         self.contents = filecontents
 
-    def __get_rows(self):
-        rows = self.contents.split('\n')
-        return rows
-
-    def __parse_top_rows(self, rows):
-        p = {}
-        toprows = rows[2:6+1]  # top 5 lines
-        # split these lines by whitespace, once (name, value)
-        toprows = [r.split(maxsplit=1) for r in toprows]
+    def __parse_bottom_row(self, name, value):
+        # value holds "value error", either of which may be "-"
+        val, err = value.split()[:2]
+        if (val == '-') or (err == '-'):
+            val, err = None, None
+        else:
+            val, err = float(val), float(err)
+        return {name: val, name+'_err': err}
 
-        for r in toprows[:4]:
-            name = r[0]
-            val = r[-1]
-            p.update({name: val})
-        p.update({'Remarks': ''})
+    def get_params(self):
+        top, bottom = {}, {}
+        started = False  # rows above "Field" hold the event title
+        for name, value in _PARAM_ROW.findall(self.contents):
+            if name == 'Field':
+                started = True
+            if not started:
+                continue
+            if name in _TOP_NAMES:
+                top[name] = value
+            else:
+                bottom.update(self.__parse_bottom_row(name, value))
+        top.setdefault('Remarks', '')
 
         # rename RA and Dec dict keys
-        p['RA'] = p.pop('RA(J2000.0)')
-        p['Dec'] = p.pop('Dec(J2000.0)')
-
-        lastrow = toprows[-1]
-        if len(lastrow) > 1:  # there are remarks
-            p.update({lastrow[0]: lastrow[1]})  # entry: {Remarks: s}
-        return p
-
-    def __parse_bottom_rows(self, rows):
-        p = {}
-        bottomrows = rows[8:]  # bottom 8 params
-        # split rows by whitespace, returns (name, value, error) list
-        bottomrows = [r.split() for r in bottomrows]
+        top['RA'] = top.pop('RA(J2000.0)')
+        top['Dec'] = top.pop('Dec(J2000.0)')
 
-        for r in bottomrows:
-            name = r[0]
-            val, err = r[1], r[2]
-            if (val is '-') or (err is '-'):
-                val, err = None, None
-            else:
-                val, err = float(val), float(err)
-            p.update({name: val, name+'_err': err})
-        return p
-
-    def get_params(self):
         params = {}
-        rows = self.__get_rows()
-
-        top = self.__parse_top_rows(rows)
-        bottom8 = self.__parse_bottom_rows(rows)
-
-        params.update(top), params.update(bottom8)
+        params.update(top), params.update(bottom)
         return params